@@ -1,9 +1,40 @@
 import streamlit as st
 import math
+import numba
+import numpy as np
 import pandas as pd
 import json
+import os
+import types
 from datetime import datetime
-from io import BytesIO
+# BytesIO/xlsxwriter ne servent qu'à l'export : importés paresseusement dans to_excel.
+
+# ==================== NOYAUX NUMBA ====================
+# Seuls les noyaux arithmétiques sont compilés en nopython ; le code Streamlit
+# (widgets, session_state) reste en Python pur. cache=True conserve le code
+# machine sur disque pour éviter la recompilation à chaque rerun du script.
+
+@numba.njit(cache=True, fastmath=True)
+def _are_a8(sal, heures, aj_min, seuil_s, ts_inf, ts_sup, seuil_h, th_inf, th_sup, partie_c, plancher):
+    """Noyau Annexe 8 (Techniciens) : retourne (a, b, c, are_brute)."""
+    if sal <= seuil_s:
+        a = (aj_min * ts_inf * sal) / 5000
+    else:
+        a = (aj_min * (ts_inf * seuil_s + ts_sup * (sal - seuil_s))) / 5000
+    if heures <= seuil_h:
+        b = (aj_min * th_inf * heures) / 507
+    else:
+        b = (aj_min * (th_inf * seuil_h + th_sup * (heures - seuil_h))) / 507
+    c = aj_min * partie_c
+    return a, b, c, max(a + b + c, plancher)
+
+@numba.njit(cache=True, fastmath=True)
+def _are_a10(sal, cachets, jours, aj_min, plancher):
+    """Noyau Annexe 10 (Artistes) : retourne (sjr, partie_a, partie_b, are_brute)."""
+    sjr = sal / jours if jours > 0 else 0.0
+    partie_a = max(aj_min, 0.70 * sjr)
+    partie_b = 12.27 * cachets / 12
+    return sjr, partie_a, partie_b, max(partie_a + partie_b, plancher)
 
 # ==================== CLASSE ARE ====================
 class AREIntermittent:
@@ -13,20 +44,22 @@ class AREIntermittent:
     AJ_MINIMALE = 31.71 # Mise à jour de la valeur de l'AJ minimale au 1er juillet 2024 (source Unédic)
     SMIC_JOURNALIER = 60.0 # Valeur indicative pour le seuil de prélèvements sociaux
 
-    PARAMS = {
-        8: {  # Techniciens
+    # Gelés (MappingProxyType) : ces barèmes réglementaires sont immuables,
+    # partagés tels quels entre les reruns Streamlit.
+    PARAMS = types.MappingProxyType({
+        8: types.MappingProxyType({  # Techniciens
             "seuil_salaire": 14400, "taux_salaire_inf": 0.42, "taux_salaire_sup": 0.05,
             "seuil_heures": 720, "taux_heures_inf": 0.26, "taux_heures_sup": 0.08,
             "partie_c": 0.40, "plancher": 38.34 # Mise à jour du plancher
-        },
-        10: {  # Artistes
+        }),
+        10: types.MappingProxyType({  # Artistes
             # Pour l'Annexe 10, nous allons implémenter la formule SJR + bonus cachets
             # Ces paramètres sont moins directement utilisés dans cette nouvelle logique
             "seuil_salaire": 13700, "taux_salaire_inf": 0.36, "taux_salaire_sup": 0.05,
             "seuil_heures": 690, "taux_heures_inf": 0.26, "taux_heures_sup": 0.08,
             "partie_c": 0.70, "plancher": 44.43 # Mise à jour du plancher
-        }
-    }
+        })
+    })
 
     @staticmethod
     def calculer_are(annexe, salaire_reference_brut_12mois, heures_travaillees_12mois, total_cachets_12mois, jours_reference=365):
@@ -44,26 +77,18 @@ class AREIntermittent:
         Returns:
             dict: Dictionnaire contenant l'ARE nette, brute et les détails.
         """
-        params = AREIntermittent.PARAMS[annexe]
         are_brute = 0
         details = {}
-        sjr = 0 # Salaire Journalier de Référence
-
-        # Calcul du SJR si jours_reference est fourni
-        if jours_reference > 0:
-            sjr = salaire_reference_brut_12mois / jours_reference
 
         if annexe == 10: # Artistes : Utilisation de la formule SJR + bonus cachets
-            # Refaire le calcul AJ pour annexe 10 selon Grok
-            # Étape 1 : SJR est déjà calculé
+            # Calcul délégué au noyau Numba _are_a10 :
+            # Étape 1 : SJR = salaire de référence / jours de référence
             # Étape 2 : Partie A (fixe ici) - Max(AJ_MINIMALE, 70% * SJR)
-            partie_a_grok = max(AREIntermittent.AJ_MINIMALE, 0.70 * sjr)
             # Étape 3 : Partie B (variable, cachets) - 12,27 * Nbre cachets / 12
-            partie_b_grok = 12.27 * total_cachets_12mois / 12
-            # Étape 4 : AJ brute (A + B)
-            are_brute = partie_a_grok + partie_b_grok
-            # Application du plancher pour l'annexe 10
-            are_brute = max(are_brute, params["plancher"])
+            # Étape 4 : AJ brute (A + B), puis application du plancher
+            sjr, partie_a_grok, partie_b_grok, are_brute = _are_a10(
+                float(salaire_reference_brut_12mois), float(total_cachets_12mois),
+                float(jours_reference), AREIntermittent.AJ_MINIMALE, *A10)
 
             details = {
                 "sjr": round(sjr, 2),
@@ -74,28 +99,10 @@ class AREIntermittent:
 
 
         elif annexe == 8: # Techniciens : Utilisation de la formule A+B+C
-
-            # Partie A (Salaire)
-            salaire_calcul_a = salaire_reference_brut_12mois
-            if salaire_calcul_a <= params["seuil_salaire"]:
-                a = (AREIntermittent.AJ_MINIMALE * params["taux_salaire_inf"] * salaire_calcul_a) / 5000
-            else:
-                a = (AREIntermittent.AJ_MINIMALE *
-                    (params["taux_salaire_inf"] * params["seuil_salaire"] +
-                     params["taux_salaire_sup"] * (salaire_calcul_a - params["seuil_salaire"]))) / 5000
-
-            # Partie B (Heures)
-            if heures_travaillees_12mois <= params["seuil_heures"]:
-                b = (AREIntermittent.AJ_MINIMALE * params["taux_heures_inf"] * heures_travaillees_12mois) / 507
-            else:
-                b = (AREIntermittent.AJ_MINIMALE *
-                    (params["taux_heures_inf"] * params["seuil_heures"] +
-                     params["taux_heures_sup"] * (heures_travaillees_12mois - params["seuil_heures"]))) / 507
-
-            # Partie C (Fixe)
-            c = AREIntermittent.AJ_MINIMALE * params["partie_c"]
-
-            are_brute = max(a + b + c, params["plancher"])
+            # Parties A (salaire), B (heures) et C (fixe) calculées par le noyau Numba
+            a, b, c, are_brute = _are_a8(
+                float(salaire_reference_brut_12mois), float(heures_travaillees_12mois),
+                AREIntermittent.AJ_MINIMALE, *A8)
 
             details = {
                 "partie_a": round(a, 2),
@@ -131,50 +138,146 @@ class AREIntermittent:
             "details": details
         }
 
+    @staticmethod
+    def calculer_are_vec(annexe, salaire_reference_brut_12mois, heures_travaillees_12mois, total_cachets_12mois, jours_reference=365):
+        """
+        Version vectorisée (NumPy) de `calculer_are` pour les balayages de scénarios.
+
+        Chaque argument numérique peut être un scalaire ou un tableau NumPy ;
+        les N scénarios sont alors calculés en quelques opérations élémentaires
+        fusionnées (np.where / np.maximum) au lieu de N appels Python.
+        Même logique de calcul que `calculer_are` (qui reste la voie du
+        formulaire unitaire), mais sans les arrondis d'affichage.
+
+        Returns:
+            dict: {"brut": ndarray, "net": ndarray} des ARE journalières.
+        """
+        params = AREIntermittent.PARAMS[annexe]
+        aj_min = AREIntermittent.AJ_MINIMALE
+
+        sal = np.asarray(salaire_reference_brut_12mois, dtype=np.float64)
+        heures = np.asarray(heures_travaillees_12mois, dtype=np.float64)
+        cachets = np.asarray(total_cachets_12mois, dtype=np.float64)
+        jours = np.asarray(jours_reference, dtype=np.float64)
+
+        if annexe == 10: # Artistes : SJR + bonus cachets
+            sjr = np.where(jours > 0, sal / jours, 0.0)
+            partie_a = np.maximum(aj_min, 0.70 * sjr)
+            partie_b = 12.27 * cachets / 12
+            are_brute = np.maximum(partie_a + partie_b, params["plancher"])
+        elif annexe == 8: # Techniciens : A + B + C
+            seuil_s = params["seuil_salaire"]
+            a = aj_min * np.where(
+                sal <= seuil_s,
+                params["taux_salaire_inf"] * sal,
+                params["taux_salaire_inf"] * seuil_s + params["taux_salaire_sup"] * (sal - seuil_s)
+            ) / 5000
+            seuil_h = params["seuil_heures"]
+            b = aj_min * np.where(
+                heures <= seuil_h,
+                params["taux_heures_inf"] * heures,
+                params["taux_heures_inf"] * seuil_h + params["taux_heures_sup"] * (heures - seuil_h)
+            ) / 507
+            c = aj_min * params["partie_c"] # Partie C scalaire
+            are_brute = np.maximum(a + b + c, params["plancher"])
+        else:
+            raise ValueError(f"Annexe non supportée : {annexe}")
+
+        # CSG/CRDS au-dessus du SMIC journalier, puis diviseur d'annualisation (Annexe 10 uniquement)
+        are_nette = np.where(are_brute > AREIntermittent.SMIC_JOURNALIER, are_brute * 0.933, are_brute)
+        if annexe == 10:
+            are_nette = are_nette / 1.76
+
+        return {"brut": are_brute, "net": are_nette}
+
+# ==================== COEFFICIENTS APLATIS ====================
+# Barèmes dépliés en floats positionnels (dérivés de PARAMS, source unique) :
+# les noyaux Numba ne reçoivent que des float64, sans lookup dict par appel,
+# ce qui laisse LLVM replier les constantes et vectoriser les branches.
+A8 = tuple(float(AREIntermittent.PARAMS[8][k]) for k in (
+    "seuil_salaire", "taux_salaire_inf", "taux_salaire_sup",
+    "seuil_heures", "taux_heures_inf", "taux_heures_sup",
+    "partie_c", "plancher"))
+A10 = (float(AREIntermittent.PARAMS[10]["plancher"]),)
+
 # ==================== CONFIGURATION ====================
 # Les VALEURS_PAR_DEFAUT peuvent être ajustées si besoin
-VALEURS_PAR_DEFAUT = {
+# (gelées ; copier avec dict() avant toute mutation, ex. session_state)
+VALEURS_PAR_DEFAUT = types.MappingProxyType({
     "smic_horaire": 11.65, # SMIC horaire brut au 1er janvier 2025 (indicatif)
     "are_annexe8": 38.34, # Plancher Annexe 8
     "are_annexe10": 44.43, # Plancher Annexe 10
     "taux_majoration_6h": 0.0, # Mis à 0 car ce bonus spécifique est retiré de la formule officielle
     "bonus_seuil_cachets": 0, # Mis à 0 car ce bonus spécifique est retiré de la formule officielle
     "bonus_montant": 0 # Mis à 0 car ce bonus spécifique est retiré de la formule officielle
-}
+})
 
-if "historique" not in st.session_state:
-    st.session_state.historique = pd.DataFrame(columns=[
-        "Date", "Type", "Annexe", "Cachets", "Cachets 6h", "Heures",
-        "Salaire Ref", "ARE Journalière", "Bonus", "ARE Mensuelle", "Details CDD"
-    ])
+# L'historique est accumulé en liste de dicts (ajout en O(1)) ; le DataFrame
+# n'est matérialisé que sur la page Historique (affichage / export Excel).
+if "historique_rows" not in st.session_state:
+    st.session_state.historique_rows = []
 
 if "parametres" not in st.session_state:
-    st.session_state.parametres = VALEURS_PAR_DEFAUT
+    st.session_state.parametres = dict(VALEURS_PAR_DEFAUT)
 
 # ==================== FONCTIONS ====================
+# Mémoïsé par session : le fichier n'est lu/parsé qu'une fois, le paramètre
+# mtime invalide le cache automatiquement si parametres.json est réécrit.
+@st.cache_resource(show_spinner=False)
+def _load_params_cached(mtime: float) -> dict:
+    with open("parametres.json", "r") as f:
+        return json.load(f)
+
 def charger_parametres():
     try:
-        with open("parametres.json", "r") as f:
-            st.session_state.parametres = json.load(f)
-    except:
-        st.session_state.parametres = VALEURS_PAR_DEFAUT
+        mtime = os.path.getmtime("parametres.json")
+        # Copie : le dict mis en cache est partagé, session_state le mute (update)
+        st.session_state.parametres = dict(_load_params_cached(mtime))
+    except (FileNotFoundError, json.JSONDecodeError):
+        st.session_state.parametres = dict(VALEURS_PAR_DEFAUT)
 
 def sauvegarder_parametres():
     with open("parametres.json", "w") as f:
         json.dump(st.session_state.parametres, f)
 
+# Signature explicite : la compilation a lieu à l'import (puis en cache disque),
+# pas au premier clic "Simuler le mois".
+@numba.njit(numba.int64(numba.int64, numba.int64, numba.int64), cache=True)
 def calcul_jni(annexe, heures_totales, jours_mois):
     """Calcul des Jours Non Indemnisés (JNI)"""
     if annexe == 10:
-        return min(math.ceil((heures_totales * 1.3) / 10), jours_mois)
+        return min(int(math.ceil((heures_totales * 1.3) / 10)), jours_mois)
     else:
-        return min(math.ceil((heures_totales * 1.4) / 8), jours_mois)
+        return min(int(math.ceil((heures_totales * 1.4) / 8)), jours_mois)
 
-def to_excel(df):
+# Mémoïsé par Streamlit (clé = contenu du DataFrame) : le classeur n'est
+# reconstruit que si l'historique a changé, pas à chaque rerun de la page.
+@st.cache_data(show_spinner=False)
+def to_excel(df: pd.DataFrame) -> bytes:
     """Export Excel"""
+    from io import BytesIO  # import paresseux : seulement sur la page Historique
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False)
+    # constant_memory : xlsxwriter écrit les lignes en flux au lieu de tout
+    # garder en mémoire ; strings_to_formulas/urls coupent les passes
+    # d'analyse de chaînes que xlsxwriter fait par défaut sur chaque cellule.
+    with pd.ExcelWriter(output, engine='xlsxwriter',
+                        engine_kwargs={'options': {'constant_memory': True,
+                                                   'strings_to_formulas': False,
+                                                   'strings_to_urls': False,
+                                                   'nan_inf_to_errors': True}}) as writer:
+        workbook = writer.book
+        ws = workbook.add_worksheet("Historique")
+        # Format monétaire unique, appliqué par colonne (avant l'écriture des
+        # lignes, exigence du mode constant_memory)
+        fmt_money = workbook.add_format({'num_format': '#,##0.00 €'})
+        for col in ("ARE Journalière", "ARE Mensuelle"):
+            if col in df.columns:
+                idx = df.columns.get_loc(col)
+                ws.set_column(idx, idx, None, fmt_money)
+        ws.write_row(0, 0, df.columns.tolist())
+        # write_row direct : évite le dispatch de type par cellule de df.to_excel
+        for r, row in enumerate(df.itertuples(index=False), 1):
+            ws.write_row(r, 0, row)
     return output.getvalue()
 
 # ==================== INTERFACE ====================
@@ -297,7 +400,7 @@ elif page == "📅 Simulateur Mensuel":
             "ARE Mensuelle": round(are_mensuelle, 2),
             "Details CDD": details_cdd
         }
-        st.session_state.historique = pd.concat([st.session_state.historique, pd.DataFrame([new_row])], ignore_index=True)
+        st.session_state.historique_rows.append(new_row)
 
         # Affichage résultats
         st.success(f"""
@@ -317,11 +420,14 @@ elif page == "📅 Simulateur Mensuel":
 elif page == "📊 Historique":
     st.title("📊 Historique Complet")
 
-    if not st.session_state.historique.empty:
+    if st.session_state.historique_rows:
+        # Matérialiser le DataFrame une seule fois à partir de la liste de lignes
+        df_historique = pd.DataFrame(st.session_state.historique_rows)
+
         # Permettre la suppression de lignes
         st.subheader("Modifier ou supprimer des entrées")
         edited_df = st.data_editor(
-            st.session_state.historique,
+            df_historique,
             column_config={
                 "ARE Journalière": st.column_config.NumberColumn(format="%.2f €"),
                 "ARE Mensuelle": st.column_config.NumberColumn(format="%.2f €")
@@ -330,13 +436,13 @@ elif page == "📊 Historique":
             use_container_width=True,
             num_rows="dynamic" # Permet d'ajouter/supprimer des lignes
         )
-        st.session_state.historique = edited_df # Mettre à jour l'historique avec les modifications
+        st.session_state.historique_rows = edited_df.to_dict("records") # Mettre à jour l'historique avec les modifications
 
         st.subheader("Exporter l'historique")
         # Export
         st.download_button(
             "📥 Exporter en Excel",
-            data=to_excel(st.session_state.historique), # Utiliser le df de session_state mis à jour
+            data=to_excel(edited_df), # Utiliser le df édité
             file_name="historique_intermittent.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )